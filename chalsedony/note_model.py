@@ -1,12 +1,13 @@
 import time
 import os
 import sqlite3
+from collections import OrderedDict
 from PySide6.QtCore import QObject, Signal
 from .utils__get_first_markdown_heading import get_markdown_heading
 from sqlite3 import Connection
 from pathlib import Path
 from enum import Enum
-from typing import final
+from typing import Callable, final
 from .db_api import Note, Folder, FolderTreeItem, NoteSearchResult, IdTable
 from datetime import date, timedelta
 
@@ -49,6 +50,13 @@ class OrderType(Enum):
 @final
 class NoteModel(QObject):
     refreshed = Signal()  # Notify view to refresh
+    # Note titles or resources changed, so anything that renders links to them
+    # (e.g. cached previews) is stale, emitted by refresh too. Not emitted for
+    # body only saves, which happen on every keystroke
+    content_changed = Signal()
+    # Resources were added or their files may have changed, emitted by refresh too
+    resources_changed = Signal()
+    LINKS_CACHE_SIZE = 128  # Number of notes to keep the links of
 
     def __init__(self, db_connection: Connection, assets: Path) -> None:
         super().__init__()
@@ -58,6 +66,15 @@ class NoteModel(QObject):
         self.ensure_fts_table()
         self._order_type = OrderType.ASC
         self._tree_data: list[FolderTreeItem] | None = None
+        # Link lookups scan every note body, cache them until a note changes
+        # LRU of note ID -> links, see _get_cached_links
+        self._backlinks_cache: OrderedDict[str, list[NoteSearchResult]] = OrderedDict()
+        self._forwardlinks_cache: OrderedDict[str, list[NoteSearchResult]] = (
+            OrderedDict()
+        )
+        # Resource ID -> asset file, rebuilt when the asset directory changes
+        self._asset_paths: dict[str, Path] = {}
+        self._asset_dir_mtime: int | None = None
 
     @property
     def order_by(self) -> OrderField:
@@ -347,9 +364,18 @@ class NoteModel(QObject):
 
     def refresh(self) -> None:
         """Refresh the model"""
+        self.clear_links_cache()
+        self._asset_dir_mtime = None
         self.rebuild_tree_data()
+        self.content_changed.emit()
+        self.resources_changed.emit()
         self.refreshed.emit()
 
+    def clear_links_cache(self) -> None:
+        """Invalidate the cached backlinks and forwardlinks"""
+        self._backlinks_cache.clear()
+        self._forwardlinks_cache.clear()
+
     class Stemmer(Enum):
         """Enum representing FTS5 tokenizer options"""
 
@@ -602,6 +628,11 @@ class NoteModel(QObject):
         cursor = self.db_connection.cursor()
         _ = cursor.execute(query, params)
         self.db_connection.commit()
+        if title is not None or body is not None:
+            self.clear_links_cache()
+        if title is not None:
+            # Other notes may render links showing this title
+            self.content_changed.emit()
 
         # Don't refresh as this could be slow on mere content change that is
         # Already reflected in the view (user can refresh or save to trigger that)
@@ -1047,32 +1078,56 @@ class NoteModel(QObject):
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
+        return self.upload_resource_data(
+            file_path.read_bytes(), file_path.name, note_id, title=title
+        )
+
+    def upload_resource_data(
+        self,
+        data: bytes,
+        filename: str,
+        note_id: str | None = None,
+        title: str | None = None,
+    ) -> str:
+        """Upload in memory data (e.g. a pasted image) as a resource
+
+        Args:
+            data: The content of the resource
+            filename: Original filename, used for the extension and MIME type
+            note_id: ID of the note to attach the resource to
+            title: Optional title for the resource (defaults to filename)
+
+        Returns:
+            ID of the newly created resource
+        """
         # Generate resource ID
         resource_id = self.create_id()
         created_time = int(time.time())
 
         # Get file info
-        file_size = file_path.stat().st_size
-        file_ext = file_path.suffix.lower()[1:]  # Remove dot from extension
+        file_size = len(data)
+        file_ext = Path(filename).suffix.lower()[1:]  # Remove dot from extension
         mime_type = "application/octet-stream"  # Default MIME type
 
         # Try to get more specific MIME type
         try:
             import mimetypes
 
-            mime_type = mimetypes.guess_type(str(file_path))[0] or mime_type
+            mime_type = mimetypes.guess_type(filename)[0] or mime_type
         except ImportError:
             print("Mimetypes module not found, using default MIME type")
             pass
 
         # Use filename as title if not provided
         if not title:
-            title = file_path.name
+            title = filename
 
-        # Copy file to assets directory
+        # Write the data to the assets directory
         asset_path = self.asset_dir / f"{resource_id}.{file_ext}"
         asset_path.parent.mkdir(parents=True, exist_ok=True)
-        _ = asset_path.write_bytes(file_path.read_bytes())
+        _ = asset_path.write_bytes(data)
+        # The directory's mtime may not have visibly changed, rebuild regardless
+        self._asset_dir_mtime = None
 
         try:
             # Insert resource record
@@ -1088,7 +1143,7 @@ class NoteModel(QObject):
                     resource_id,
                     title,
                     mime_type,
-                    file_path.name,  # Original filename
+                    filename,  # Original filename
                     created_time,
                     created_time,
                     file_ext,
@@ -1114,6 +1169,9 @@ class NoteModel(QObject):
             print("Model: Failed to upload resource")
 
         self.db_connection.commit()
+        # Links to this resource may already be rendered as missing
+        self.content_changed.emit()
+        self.resources_changed.emit()
         return resource_id
 
     def get_resource_title(self, resource_id: str) -> str | None:
@@ -1141,12 +1199,25 @@ class NoteModel(QObject):
 
         Notes:
             The filepath field does not appear to be used by Joplin
+
+        Implementation Notes:
+            Assets are named {resource_id}.{ext}. Rather than listing the asset
+            directory for every lookup, the files are indexed by the part of
+            their name before the first dot. The index is rebuilt when the
+            directory's modification time changes, i.e. files were added,
+            removed or renamed, including by a sync outside this application.
         """
-        # Find the first matching file with this ID prefix
-        for path in self.asset_dir.iterdir():
-            if path.name.startswith(resource_id):
-                return path
-        return None
+        mtime = self.asset_dir.stat().st_mtime_ns
+        if mtime != self._asset_dir_mtime:
+            asset_paths: dict[str, Path] = {}
+            with os.scandir(self.asset_dir) as entries:
+                for entry in entries:
+                    _ = asset_paths.setdefault(
+                        entry.name.partition(".")[0], Path(entry.path)
+                    )
+            self._asset_paths = asset_paths
+            self._asset_dir_mtime = mtime
+        return self._asset_paths.get(resource_id)
 
     def what_is_this(self, id: str) -> IdTable | None:
         """Determine the table a given ID belongs to, None if not found
@@ -1176,6 +1247,38 @@ class NoteModel(QObject):
 
         return None
 
+    def what_are_these(self, ids: list[str]) -> dict[str, IdTable]:
+        """Determine the tables that a list of IDs belong to, see what_is_this
+
+        Args:
+            ids: The IDs to look up
+
+        Returns:
+            Dictionary mapping each ID found to the table it belongs to, IDs that
+            were not found are omitted
+
+        Implementation Notes:
+            This issues one query per table regardless of the number of IDs,
+            rather than up to three queries per ID with what_is_this.
+        """
+        found: dict[str, IdTable] = {}
+        if not ids:
+            return found
+        cursor = self.db_connection.cursor()
+        placeholders = ",".join("?" * len(ids))
+        # Same precedence as what_is_this, the first table to claim an ID wins
+        for table, id_table in (
+            ("notes", IdTable.NOTE),
+            ("folders", IdTable.FOLDER),
+            ("resources", IdTable.RESOURCE),
+        ):
+            _ = cursor.execute(
+                f"SELECT id FROM {table} WHERE id IN ({placeholders})", ids
+            )
+            for (id,) in cursor.fetchall():
+                _ = found.setdefault(id, id_table)
+        return found
+
     def get_resource_mime_type(
         self, resource_id: str
     ) -> tuple[str | None, ResourceType]:
@@ -1292,7 +1395,14 @@ class NoteModel(QObject):
         Implememenation Notes:
             - This looks for the id, not for a markdown link or a prefix of `:/`, this may be changed in the future
               for now this simplicity is perferable
+            - Results are cached until a note is changed, see clear_links_cache
         """
+        return self._get_cached_links(
+            self._backlinks_cache, note_id, self._query_backlinks
+        )
+
+    def _query_backlinks(self, note_id: str) -> list[NoteSearchResult]:
+        """Query the notes that link to this note, see get_backlinks"""
         cursor = self.db_connection.cursor()
         _ = cursor.execute(
             """
@@ -1302,7 +1412,9 @@ class NoteModel(QObject):
             """,
             (note_id,),
         )
-        return [NoteSearchResult(id=row[0], title=row[1]) for row in cursor.fetchall()]
+        return [
+            NoteSearchResult(id=row[0], title=row[1]) for row in cursor.fetchall()
+        ]
 
     def get_forwardlinks(self, note_id: str) -> list[NoteSearchResult]:
         """Get all notes that this note links to
@@ -1314,7 +1426,32 @@ class NoteModel(QObject):
 
         Returns:
             List of NoteSearchResult containing note IDs and titles of linked notes
+
+        Implementation Notes:
+            - Results are cached until a note is changed, see clear_links_cache
         """
+        return self._get_cached_links(
+            self._forwardlinks_cache, note_id, self._query_forwardlinks
+        )
+
+    def _get_cached_links(
+        self,
+        cache: OrderedDict[str, list[NoteSearchResult]],
+        note_id: str,
+        query: Callable[[str], list[NoteSearchResult]],
+    ) -> list[NoteSearchResult]:
+        """Look up the links of a note in an LRU cache, querying them on a miss"""
+        if (cached := cache.get(note_id)) is not None:
+            cache.move_to_end(note_id)
+            return cached
+        links = query(note_id)
+        cache[note_id] = links
+        if len(cache) > self.LINKS_CACHE_SIZE:
+            _ = cache.popitem(last=False)
+        return links
+
+    def _query_forwardlinks(self, note_id: str) -> list[NoteSearchResult]:
+        """Query the notes that this note links to, see get_forwardlinks"""
         # First get the note body
         cursor = self.db_connection.cursor()
         _ = cursor.execute("SELECT body FROM notes WHERE id = ?", (note_id,))
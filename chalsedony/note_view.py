@@ -1,4 +1,4 @@
-from typing import final
+from typing import Callable, final
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -34,6 +34,7 @@ from .widgets__edit_preview import EditPreview
 from .widgets__search_tab import NoteListWidget, SearchSidebar
 
 HISTORY_TIME = 1000
+LINKS_DELAY = 30  # Milliseconds to coalesce back/forward link lookups
 
 
 @final
@@ -82,6 +83,11 @@ class NoteView(QWidget):
         self._left_animation: QPropertyAnimation | None = None
         self._right_animation: QPropertyAnimation | None = None
         self._sidebar_width = self.DEFAULT_SIDEBAR_WIDTH
+        # Only look up the links of the last note selected in quick succession
+        self._links_timer = QTimer(self)
+        self._links_timer.setSingleShot(True)
+        self._links_timer.setInterval(LINKS_DELAY)
+        _ = self._links_timer.timeout.connect(self._populate_back_and_forward_links)
         self.setup_ui()
         self._populate_ui()
         self._connect_signals()
@@ -149,14 +155,13 @@ class NoteView(QWidget):
         self._populate_back_and_forward_links()
 
     def _populate_back_and_forward_links(self) -> None:
-        QApplication.processEvents()
-        if self.current_note_id:
-            self.backlinks_list.populate(self.model.get_backlinks(self.current_note_id))
-            self.forwardlinks_list.populate(
-                self.model.get_forwardlinks(self.current_note_id)
-            )
-        else:
-            print("unable to populate backlinks and forwardlinks")
+        # Nothing to show while a folder is selected
+        if not self.current_note_id:
+            return
+        self.backlinks_list.populate(self.model.get_backlinks(self.current_note_id))
+        self.forwardlinks_list.populate(
+            self.model.get_forwardlinks(self.current_note_id)
+        )
 
     def setup_ui(self) -> None:
         # Main layout to hold the splitter
@@ -303,9 +308,8 @@ class NoteView(QWidget):
         # Content Area
         self.content_area.status_bar_message.connect(self.send_status_message)
         _ = self.content_area.editor.imageUploadRequested.connect(
-                lambda file_path: self.upload_resource(file_path=file_path)
-
-                )
+            self.upload_image_data
+        )
 
         # Connect search tab signals
         self.search_tab.search_text_changed.connect(self._on_search_text_changed)
@@ -539,14 +543,9 @@ class NoteView(QWidget):
                         content_area.preview.content_already_set = False  # This causes a Full Refresh  # TODO candidate to refactor
                         if change_tree:
                             self.tree_widget.set_current_item_by_data(item_data)
-                        self.backlinks_list.populate(
-                            self.model.get_backlinks(item_data.id)
-                        )
-                        self.forwardlinks_list.populate(
-                            self.model.get_forwardlinks(item_data.id)
-                        )
-                        # I wanted to do this but it doesn't work # TODO
-                        # self._populate_back_and_forward_links()
+                        # Deferred so that moving quickly through the tree
+                        # only queries the links of the note it stops on
+                        self._links_timer.start()
                 case ItemType.FOLDER:
                     self.current_note_id = None
                     content_area.editor.clear()
@@ -674,14 +673,11 @@ class NoteView(QWidget):
 
     def upload_resource(self, file_path: str | None = None, title: str | None = None) -> None:
         """Handle resource file upload with optional title"""
-        from PySide6.QtWidgets import QFileDialog, QInputDialog
+        from PySide6.QtWidgets import QFileDialog
 
         if not self.model:
             return
 
-        # Get current note ID
-        note_id = self.get_current_note_id()
-
         # Open file dialog
         if file_path is None:
             file_path, _ = QFileDialog.getOpenFileName(
@@ -694,37 +690,75 @@ class NoteView(QWidget):
         if not file_path:  # User canceled
             return
 
+        path = Path(file_path)
+        self._upload_and_link(
+            lambda note_id, resource_title: self.model.upload_resource(
+                path, note_id, title=resource_title
+            ),
+            name=path.name,
+            default_title=path.stem,  # Default to filename without extension
+            title=title,
+        )
+
+    def upload_image_data(self, data: bytes, file_ext: str) -> None:
+        """Upload an in memory image (e.g. pasted) as a resource of the current note"""
+        filename = f"pasted_image.{file_ext}"
+        self._upload_and_link(
+            lambda note_id, resource_title: self.model.upload_resource_data(
+                data, filename, note_id, title=resource_title
+            ),
+            name="pasted image",
+            default_title="pasted_image",
+        )
+
+    def _upload_and_link(
+        self,
+        upload: Callable[[str | None, str | None], str],
+        name: str,
+        default_title: str,
+        title: str | None = None,
+    ) -> None:
+        """Upload a resource and link to it from the current note
+
+        Args:
+            upload: Uploads the resource given the note ID and title, returning
+                the ID of the new resource
+            name: Describes the resource in status messages if it has no title
+            default_title: Title suggested when prompting the user
+            title: Title of the resource, the user is prompted if None
+        """
+        from PySide6.QtWidgets import QInputDialog
+
+        # Get current note ID
+        note_id = self.get_current_note_id()
+
         # Get resource title from user
         if title is None:
             title, ok = QInputDialog.getText(
                 self,
                 "Resource Title",
                 "Enter a title for the resource:",
-                text=Path(file_path).stem,  # Default to filename without extension
+                text=default_title,
             )
-
             if not ok:  # User canceled
                 return
 
-            print(f"Uploading file: {file_path} with title: {title}")
         try:
-            resource_id = self.model.upload_resource(
-                Path(file_path), note_id, title=title if title else None
-            )
-            self.send_status_message(
-                f"Uploaded resource: {title or Path(file_path).name}"
-            )
-            # Emit signal with resource ID if needed
-            print(f"Resource ID: {resource_id}")
+            resource_id = upload(note_id, title if title else None)
+            self.send_status_message(f"Uploaded resource: {title or name}")
         except Exception as e:
-            self.send_status_message(f"Error uploading file: {str(e)}")
+            self.send_status_message(f"Error uploading {name}: {str(e)}")
             return
 
         if note_id is not None and resource_id:
-            # Create markdown link
-            resource_name = self.model.get_resource_title(resource_id)
-            text = f"![{resource_name}](:/{resource_id})"
-            self.insert_text_at_cursor(text, copy=True)
+            self._insert_resource_link(resource_id)
+
+    def _insert_resource_link(self, resource_id: str) -> None:
+        """Insert a markdown link to a resource at the cursor"""
+        resource_name = self.model.get_resource_title(resource_id)
+        text = f"![{resource_name}](:/{resource_id})"
+        self.insert_text_at_cursor(text, copy=True)
+
     def insert_text_at_cursor(self, text: str, copy: bool = False) -> None:
         """Insert text at the current cursor position in the editor"""
         self.content_area.editor.insert_text_at_cursor(text, copy=copy)
@@ -246,8 +246,10 @@ class NeovimHandler(QObject):
         """
         if self.nvim_process is None:
             try:
-                if os.path.exists(self.socket_path):
-                    os.remove(self.socket_path)
+                try:
+                    os.unlink(self.socket_path)
+                except FileNotFoundError:
+                    pass
 
                 self.nvim_process = subprocess.Popen(
                     ["nvim", "--listen", self.socket_path, "--headless"]
@@ -497,11 +499,12 @@ class NeovimHandler(QObject):
 
     def _remove_socket(self) -> None:
         """Remove the socket file if it exists"""
-        if os.path.exists(self.socket_path):
-            try:
-                os.remove(self.socket_path)
-            except Exception as e:
-                print(f"Failed to remove socket file: {e}")
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Failed to remove socket file: {e}")
 
     def __del__(self) -> None:
         """Destructor to ensure cleanup when object is deleted"""
@@ -1,81 +1,97 @@
+from PySide6.QtCore import QItemSelection, QItemSelectionModel
 from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem
-from typing import List, Tuple, Dict
+from typing import Iterator, Set, Tuple
 
 
 class TreeStateHandler:
+    """
+    Save and restore the selection and fold state of a tree widget
+
+    Items are identified by their path of child indices. NoteTree uses
+    StatefulTree.export_state and restore_state instead, which key items by id.
+    """
+
     def __init__(self, tree_widget: QTreeWidget) -> None:
         self.tree_widget = tree_widget
-        self.selected_paths: List[Tuple[int, ...]] = []
+        self.selected_paths: Set[Tuple[int, ...]] = set()
+        # Everything else is folded on restore, so only expanded items are kept
+        self.expanded_paths: Set[Tuple[int, ...]] = set()
 
     def save_state(self) -> None:
-        self.selected_paths = self._get_selected_paths()
-        self.fold_state: Dict[Tuple[int, ...], bool] = self._get_tree_fold_state(
-            self.tree_widget.invisibleRootItem()
-        )
+        self.selected_paths = {
+            self._get_path(item) for item in self.tree_widget.selectedItems()
+        }
+        self.expanded_paths = {
+            path
+            for path, item in self._iter_items(self.tree_widget.invisibleRootItem())
+            if item.isExpanded()
+        }
 
     def restore_state(self, tree_widget: QTreeWidget | None) -> None:
         if tree_widget:
             self.tree_widget = tree_widget
-        self._restore_selection()
-        self._set_tree_fold_state(self.tree_widget.invisibleRootItem(), self.fold_state)
-
-    def _get_tree_fold_state(
-        self, parent: QTreeWidgetItem, path: Tuple[int, ...] = ()
-    ) -> Dict[Tuple[int, ...], bool]:
-        state: Dict[Tuple[int, ...], bool] = {}
-        for i in range(parent.childCount()):
-            child = parent.child(i)
-            current_path = path + (i,)
-            index = self.tree_widget.indexFromItem(child)
-            state[current_path] = self.tree_widget.isExpanded(index)
-            if child.childCount():
-                state.update(self._get_tree_fold_state(child, current_path))
-        return state
+        # Suppress repaints while the state is applied, then repaint once
+        updates_enabled = self.tree_widget.updatesEnabled()
+        self.tree_widget.setUpdatesEnabled(False)
+        try:
+            self._restore_selection()
+            # Each setExpanded call triggers a relayout of the tree, so fold
+            # everything in a single call and only expand the saved items
+            self.tree_widget.collapseAll()
+            for path in self.expanded_paths:
+                if item := self._get_item_from_path(path):
+                    item.setExpanded(True)
+        finally:
+            self.tree_widget.setUpdatesEnabled(updates_enabled)
 
-    def _set_tree_fold_state(
-        self,
+    @staticmethod
+    def _iter_items(
         parent: QTreeWidgetItem,
-        state: Dict[Tuple[int, ...], bool],
-        path: Tuple[int, ...] = (),
-    ) -> None:
-        for i in range(parent.childCount()):
-            child = parent.child(i)
-            current_path = path + (i,)
-            if current_path in state:
-                index = self.tree_widget.indexFromItem(child)
-                self.tree_widget.setExpanded(index, state[current_path])
-                if child.childCount():
-                    self._set_tree_fold_state(child, state, current_path)
+    ) -> Iterator[Tuple[Tuple[int, ...], QTreeWidgetItem]]:
+        """Yield the path and item of every descendant of parent"""
+        # Walk with an explicit stack rather than recursing
+        stack: list[Tuple[Tuple[int, ...], QTreeWidgetItem]] = [((), parent)]
+        while stack:
+            path, item = stack.pop()
+            for i in range(item.childCount()):
+                if (child := item.child(i)) is not None:
+                    child_path = path + (i,)
+                    yield child_path, child
+                    stack.append((child_path, child))
 
-    def _get_selected_paths(self) -> List[Tuple[int, ...]]:
-        """Returns a list of paths for the currently selected items."""
-        selected_paths: List[Tuple[int, ...]] = []
-        for item in self.tree_widget.selectedItems():
-            path: List[int] = []
-            while item:
-                parent = item.parent()
-                index = (
-                    parent.indexOfChild(item)
-                    if parent
-                    else self.tree_widget.indexOfTopLevelItem(item)
-                )
-                path.append(index)
-                item = parent
-            selected_paths.append(tuple(reversed(path)))
-        return selected_paths
+    def _get_path(self, item: QTreeWidgetItem) -> Tuple[int, ...]:
+        """Returns the child indices leading from the root to item."""
+        path: list[int] = []
+        current: QTreeWidgetItem | None = item
+        while current is not None:
+            parent = current.parent()
+            path.append(
+                parent.indexOfChild(current)
+                if parent is not None
+                else self.tree_widget.indexOfTopLevelItem(current)
+            )
+            current = parent
+        return tuple(reversed(path))
 
     def _restore_selection(self) -> None:
         """Restore selection based on the stored paths."""
+        # Submit the whole selection in one call rather than item by item
+        selection = QItemSelection()
         for path in self.selected_paths:
-            item = self._get_item_from_path(path)
-            if item:
-                item.setSelected(True)
+            if item := self._get_item_from_path(path):
+                index = self.tree_widget.indexFromItem(item)
+                selection.select(index, index)
+        self.tree_widget.selectionModel().select(
+            selection,
+            QItemSelectionModel.SelectionFlag.Select
+            | QItemSelectionModel.SelectionFlag.Rows,
+        )
 
     def _get_item_from_path(self, path: Tuple[int, ...]) -> QTreeWidgetItem | None:
         """Retrieve an item based on its path (indices) in the tree."""
-        item = self.tree_widget.invisibleRootItem()
+        item: QTreeWidgetItem | None = self.tree_widget.invisibleRootItem()
         for index in path:
-            item = item.child(index)
             if item is None:
                 return None
+            item = item.child(index)
         return item
@@ -1,7 +1,11 @@
 from pathlib import Path
+from collections import OrderedDict
+from functools import lru_cache
 from time import time
 from typing import Callable, final, override
 import json
+from html import escape
+import re
 from PySide6.QtWidgets import (
     QApplication,
     QTextEdit,
@@ -9,7 +13,7 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QSplitter,
 )
-from PySide6.QtGui import QFont, QImage, QWheelEvent
+from PySide6.QtGui import QDesktopServices, QFont, QImage, QTextCursor, QWheelEvent
 from PySide6.QtCore import Signal
 import tempfile
 import os
@@ -27,7 +31,9 @@ from PySide6.QtWebEngineCore import (
     QWebEngineUrlRequestInfo,
 )
 from PySide6.QtCore import (
+    QBuffer,
     QDir,
+    QIODevice,
     QDirIterator,
     Qt,
     Property,
@@ -37,7 +43,10 @@ from PySide6.QtCore import (
     QMimeData,
     QPoint,
     QObject,
+    QRunnable,
+    QThreadPool,
     Signal,
+    Slot,
     QTimer,
 )
 import tempfile
@@ -46,7 +55,6 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import threading
 from PySide6.QtWebEngineWidgets import QWebEngineView
-from bs4 import BeautifulSoup, Tag
 import markdown
 from markdown.extensions.toc import TocExtension
 from markdown_gfm_admonition import GfmAdmonitionExtension
@@ -57,12 +65,15 @@ from pymdownx import arithmatex
 from .db_api import IdTable, ItemType
 from .note_model import ResourceType
 
-import subprocess
 import platform
 from . import katex_resources_rc  # pyright: ignore [reportUnusedImport]  # noqa
 from . import katex_fonts_rc  # pyright: ignore [reportUnusedImport] # noqa
 
 
+# Schemes registered by register_scheme, Qt warns if one is registered twice
+REGISTERED_SCHEMES: set[str] = set()
+
+
 # Register custom schemes for the Web Engine Preview
 def register_scheme(
     scheme_name: str,
@@ -71,6 +82,9 @@ def register_scheme(
         | QWebEngineUrlScheme.Flag.CorsEnabled
     ),
 ) -> None:
+    if scheme_name in REGISTERED_SCHEMES:
+        return
+    REGISTERED_SCHEMES.add(scheme_name)
     scheme = QWebEngineUrlScheme(scheme_name.encode())
     scheme.setSyntax(QWebEngineUrlScheme.Syntax.Path)
     scheme.setFlags(scheme_flags)
@@ -80,24 +94,88 @@ def register_scheme(
 register_scheme("note")
 register_scheme("qrc")
 
+# Internal links and sources as produced by the markdown, i.e. <a href=":/{id}">
+# and <img src=":/{id}">
+NOTE_LINK_RE = re.compile(r'(<a\s[^>]*?\bhref="|\bsrc="):/([^"]+)"')
+# A whole internal link element, used for the links that are replaced by an embed
+EMBED_LINK_RE = re.compile(
+    r'<a\s([^>]*?\bhref=":/([^"]+)"[^>]*)>(.*?)</a>', re.DOTALL
+)
+TITLE_RE = re.compile(r'\btitle="([^"]*)"')
+# Base URL of the preview page, so relative links resolve to the note scheme
+NOTE_BASE_URL = QUrl("note://")
+
+# Embedded code files become part of the preview HTML, which is rebuilt and
+# sent to the web view on every render, so only show the start of large files
+MAX_INLINE_CODE_BYTES = 256 * 1024
+
+# Configuration for the markdown extensions used by the preview, see EditPreview.md
+MD_EXTENSION_CONFIGS = {  # pyright: ignore [reportUnknownVariableType]
+    "pymdownx.superfences": {
+        "custom_fences": [
+            {
+                "name": "mermaid",
+                "class": "mermaid",
+                "format": pymdownx.superfences.fence_div_format,  # pyright: ignore [reportUnknownMemberType]
+            },
+            {
+                "name": "math",
+                "class": "arithmatex",
+                "format": arithmatex.arithmatex_fenced_format(which="generic"),
+            },
+        ]
+    },
+    "pymdownx.inlinehilite": {
+        "custom_inline": [
+            {
+                "name": "math",
+                "class": "arithmatex",
+                "format": arithmatex.arithmatex_inline_format(which="generic"),
+            }
+        ]
+    },
+    "pymdownx.arithmatex": {"generic": True},
+    # "pymdownx.highlight": {
+    #     "auto_title": True,
+    #     "auto_title_map": {"Python Console Session": "Python"},
+    #     "linenums_style": "inline",
+    #     "line_spans": "__codeline",
+    # },
+}
+
 
 @final
 class EditPreview(QWidget):
     ANIMATION_DURATION = 300  # Animation duration in milliseconds
+    RENDER_DEBOUNCE_MS = 250  # Minimum quiet time before the preview re-renders
+    RENDER_CACHE_SIZE = 16  # Number of rendered documents to keep
+    SCROLL_SYNC_MS = 16  # Minimum time between preview scroll updates (~60 Hz)
     status_bar_message = Signal(str)  # Signal to send messages to status bar
 
     def __init__(self, note_model: NoteModel, current_note_id: Callable[[], str | None], parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self._splitter_animation: QPropertyAnimation | None = None
-        self._debounce_timer = QTimer()
+        self._debounce_timer = QTimer(self)
         self._debounce_timer.setSingleShot(True)
         self._debounce_timer.timeout.connect(self.update_preview_local)
+        self._scroll_timer = QTimer(self)
+        self._scroll_timer.setSingleShot(True)
+        self._scroll_timer.setInterval(self.SCROLL_SYNC_MS)
+        self._scroll_timer.timeout.connect(self._sync_preview_scroll)
         self.note_model = note_model
         self.asset_dir = note_model.asset_dir
+        # Editor scroll position to restore once the preview has (re)loaded
+        self._pending_scroll_fraction = 0.0
+        # The scroll position last sent to the preview
+        self._last_scroll_fraction: float | None = None
         self.setup_ui()
         self._md: markdown.Markdown | None = None
-        self.debounce_delay = 300  # Milliseconds between preview updates
+        # (note id, markdown) -> html of recent renders, least recent first
+        self._render_cache: OrderedDict[tuple[str | None, str], str] = OrderedDict()
+        self.debounce_delay = self.RENDER_DEBOUNCE_MS  # Milliseconds between preview updates
         self.current_note_id = current_note_id
+        # The HTML also depends on the titles and resources that notes link to
+        _ = self.note_model.content_changed.connect(self.clear_render_cache)
 
     def setup_ui(self) -> None:
         # Create main layout
@@ -121,8 +199,10 @@ class EditPreview(QWidget):
         # Connect the edit widget to update preview and scroll with debounce
         _ = self.editor.textChanged.connect(self.handle_text_changed)
         _ = self.editor.verticalScrollBar().valueChanged.connect(
-            self._sync_preview_scroll
+            self._schedule_preview_scroll
         )
+        # Scroll a freshly loaded page to where the editor was
+        _ = self.preview.page().loadFinished.connect(self._restore_preview_scroll)
 
         self.splitter.addWidget(self.editor)
         self.splitter.addWidget(self.preview)
@@ -147,47 +227,15 @@ class EditPreview(QWidget):
 
     @property
     def md(self) -> markdown.Markdown:
-        # NOTE: Do not store the md object as a class attribute, it should be
-        # used ONCE per rendered documents. Otherwise the extension will keep
-        # a track of the state of the document as it updates. For examples
-        # Each refresh will cause the footnotes to have multiple references
+        # NOTE: Building the Markdown object (loading the extensions and
+        # compiling their patterns) is the most expensive part of a render, so
+        # it is built once and reset before every use. Without the reset the
+        # extensions keep track of the state of the previous document, e.g.
+        # each refresh would cause the footnotes to have multiple references
         # back to the same point, as it's seen the refresh as more content
         # of the same document.
-        # if self._md:
-        #     return self._md
-        # else:
-        extension_configs = {  # pyright: ignore [reportUnknownVariableType]
-            "pymdownx.superfences": {
-                "custom_fences": [
-                    {
-                        "name": "mermaid",
-                        "class": "mermaid",
-                        "format": pymdownx.superfences.fence_div_format,  # pyright: ignore [reportUnknownMemberType]
-                    },
-                    {
-                        "name": "math",
-                        "class": "arithmatex",
-                        "format": arithmatex.arithmatex_fenced_format(which="generic"),
-                    },
-                ]
-            },
-            "pymdownx.inlinehilite": {
-                "custom_inline": [
-                    {
-                        "name": "math",
-                        "class": "arithmatex",
-                        "format": arithmatex.arithmatex_inline_format(which="generic"),
-                    }
-                ]
-            },
-            "pymdownx.arithmatex": {"generic": True},
-            # "pymdownx.highlight": {
-            #     "auto_title": True,
-            #     "auto_title_map": {"Python Console Session": "Python"},
-            #     "linenums_style": "inline",
-            #     "line_spans": "__codeline",
-            # },
-        }
+        if self._md:
+            return self._md.reset()
         self._md = markdown.Markdown(
             extensions=[
                 TocExtension(anchorlink=False,toc_depth="2-5"),
@@ -215,17 +263,18 @@ class EditPreview(QWidget):
                 "pymdownx.progressbar",
                 CustomWikiLinkExtension(note_model=self.note_model, current_note_id=self.current_note_id, base_url="note://"),
             ],
-            extension_configs=extension_configs,  # pyright: ignore [reportUnknownArgumentType] # type: ignore [arg-type]
+            extension_configs=MD_EXTENSION_CONFIGS,  # pyright: ignore [reportUnknownArgumentType] # type: ignore [arg-type]
         )
         return self._md
 
     def convert_md_to_html(self, md_text: str | None = None) -> str:
-        if not md_text:
+        # An empty document is a valid input, only read the editor if no text
+        # was given, so callers can pass in a snapshot they already have
+        if md_text is None:
             md_text = self.editor.toPlainText()
         html = self.md.convert(md_text)
         # Replace image URLs to use note: scheme
         html = self.preview.rewrite_html_links(html)
-        html = html.replace('src=":', 'src="note:/')
         return html
 
     def handle_text_changed(self) -> None:
@@ -237,33 +286,34 @@ class EditPreview(QWidget):
         Converts the editor from markdown to HTML and sets the preview HTML content.
         Preserves the current scroll position during updates.
         """
-        # Get current scroll position before updating
-        scroll_fraction = self.editor.verticalScrollFraction()
-
-        # Convert markdown to HTML
-        now = time()
-        html = self.convert_md_to_html()
-        # Set a dynamic debounce for large documents
-        self.debounce_delay = max(20, int((time() - now) * 1000) + 20)
-
-        # Connect to load finished signal to ensure scroll happens after content loads
-        def restore_scroll(success: bool) -> None:
-            if success:
-                js = f"window.scrollTo(0, document.documentElement.scrollHeight * {scroll_fraction});"
-                self.preview.page().runJavaScript(js)
-
-        # Disconnect any previous connections to avoid multiple handlers
-        try:
-            if not self.preview.page().loadFinished.disconnect():
-                print("Failed to disconnect loadFinished signal")
-        except Exception:
-            pass
-
-        if not self.preview.page().loadFinished.connect(restore_scroll):
-            print("Failed to connect loadFinished signal")
+        # Get current scroll position before updating, in case the page reloads
+        self._pending_scroll_fraction = self.editor.verticalScrollFraction()
+
+        # Convert markdown to HTML, reusing a recent result for the same text
+        # (e.g. textChanged fired without an actual edit, or undo and redo)
+        md_text = self.editor.toPlainText()
+        key = (self.current_note_id(), md_text)
+        if (html := self._render_cache.get(key)) is not None:
+            self._render_cache.move_to_end(key)
+        else:
+            now = time()
+            html = self.convert_md_to_html(md_text)
+            # Set a dynamic debounce for large documents, never dropping below
+            # RENDER_DEBOUNCE_MS so that a burst of keystrokes renders only once
+            self.debounce_delay = max(
+                self.RENDER_DEBOUNCE_MS, int((time() - now) * 1000) + 20
+            )
+            self._render_cache[key] = html
+            if len(self._render_cache) > self.RENDER_CACHE_SIZE:
+                _ = self._render_cache.popitem(last=False)
 
         self.preview.set_html(html)
 
+    def _restore_preview_scroll(self, success: bool) -> None:
+        """Restore the scroll position once the content has loaded"""
+        if success:
+            self._scroll_preview_to(self._pending_scroll_fraction)
+
     def _get_editor_width(self) -> float:
         return float(self.editor.width())
 
@@ -316,10 +366,26 @@ class EditPreview(QWidget):
         """Split editor and preview equally"""
         self._animate_splitter(0.5)
 
+    def _schedule_preview_scroll(self) -> None:
+        """Throttle scroll syncing so each wheel tick doesn't run JavaScript"""
+        # Not restarted while pending, so the preview still follows a
+        # continuous scroll at SCROLL_SYNC_MS intervals
+        if not self._scroll_timer.isActive():
+            self._scroll_timer.start()
+
     def _sync_preview_scroll(self) -> None:
         """Synchronize the preview scroll position with the editor"""
         scroll_fraction = self.editor.verticalScrollFraction()
-        js = f"window.scrollTo(0, document.documentElement.scrollHeight * {scroll_fraction});"
+        if (
+            self._last_scroll_fraction is not None
+            and abs(scroll_fraction - self._last_scroll_fraction) < 0.001
+        ):
+            return
+        self._scroll_preview_to(scroll_fraction)
+
+    def _scroll_preview_to(self, fraction: float) -> None:
+        self._last_scroll_fraction = fraction
+        js = f"window.scrollTo(0, document.documentElement.scrollHeight * {fraction});"
         self.preview.page().runJavaScript(js)
 
     def apply_dark_theme(self, dark_mode: bool) -> None:
@@ -327,10 +393,15 @@ class EditPreview(QWidget):
             self.preview.settings().WebAttribute.ForceDarkMode, dark_mode
         )
 
+    def clear_render_cache(self) -> None:
+        """Forget previously rendered HTML, e.g. after linked notes changed"""
+        self._render_cache.clear()
+
     def refresh_preview(self) -> None:
         """Refresh the preview content"""
         # Reset the HTML base template to ensure the preview is updated
         self.preview.content_already_set = False
+        self.clear_render_cache()
         self.preview.set_html(self.convert_md_to_html())
 
 
@@ -384,9 +455,44 @@ class TempFileEventHandler(FileSystemEventHandler, QObject):
             self.file_modified.emit(event.src_path)
 
 
+class HtmlToMarkdownSignals(QObject):
+    # Paste ID, content generation of the editor and the converted markdown
+    finished = Signal(int, int, str)
+
+
+class HtmlToMarkdownJob(QRunnable):
+    """Convert pasted HTML to markdown on a worker thread
+
+    A large clipboard (e.g. a whole web page) can take seconds to convert,
+    which would otherwise freeze the editor.
+
+    The job owns its signals object, unparented, so closing the editor
+    during the conversion can't delete it before the result is emitted.
+    """
+
+    def __init__(self, html: str, paste_id: int, generation: int) -> None:
+        super().__init__()
+        self.html = html
+        self.paste_id = paste_id
+        self.generation = generation
+        self.signals = HtmlToMarkdownSignals()
+
+    @override
+    def run(self) -> None:
+        try:
+            # Convert HTML to markdown
+            markdown_text = html_to_markdown(self.html)
+        except Exception:
+            from bs4 import BeautifulSoup
+
+            soup = BeautifulSoup(self.html, "html.parser")
+            markdown_text = soup.get_text()
+        self.signals.finished.emit(self.paste_id, self.generation, markdown_text)
+
+
 class MDTextEdit(MyTextEdit, VimTextEdit):
-    # Signal emitted when an image is pasted: (filepath, title)
-    imageUploadRequested: Signal = Signal(str)  # Filepath
+    # Signal emitted when an image is pasted
+    imageUploadRequested: Signal = Signal(bytes, str)  # Image data, file extension
     # Signal emitted with HTML content when copied
     request_copy_md_as_html: Signal = Signal(str)
     _syncing_to_editor = False
@@ -398,15 +504,29 @@ class MDTextEdit(MyTextEdit, VimTextEdit):
         # Create context menu
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self._show_context_menu)
-        # Create a persistent temp directory for pasted images
-        self.temp_dir: str = tempfile.mkdtemp(prefix="chalsedony_")
         self.highlighter: MarkdownHighlighter = MarkdownHighlighter(self.document())
+        # Incremented whenever the whole text is replaced (e.g. another note is
+        # loaded), so late results of a paste aren't inserted into other text
+        self._content_generation = 0
+        # Paste ID -> where the converted HTML of that paste is inserted
+        self._pending_pastes: dict[int, QTextCursor] = {}
+        self._next_paste_id = 0
 
         # File Watching
         self._temp_file_path: str | None = None
         self.file_event_handler: TempFileEventHandler | None = None
         self.observer: Observer | None = None
 
+    @override
+    def setPlainText(self, text: str) -> None:
+        self._content_generation += 1
+        super().setPlainText(text)
+
+    @override
+    def clear(self) -> None:
+        self._content_generation += 1
+        super().clear()
+
     # This is needed to paste HTML but copy plain text
     @override
     def createMimeDataFromSelection(self) -> QMimeData:
@@ -441,31 +561,42 @@ class MDTextEdit(MyTextEdit, VimTextEdit):
         if source.hasImage():
             image = QImage(source.imageData())  # pyright: ignore [reportAny]
             if not image.isNull():
-                # Save image to temp file
-                temp_path = os.path.join(self.temp_dir, f"pasted_image_{id(image)}.png")
-                if image.save(temp_path):
+                # Encode the image in memory, the upload writes it to the assets
+                buffer = QBuffer()
+                _ = buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+                # The stubs type the format as bytes, but PySide only accepts str
+                if image.save(buffer, "PNG"):  # type: ignore [call-overload]
                     # Emit signal for upload
-                    self.imageUploadRequested.emit(temp_path)
+                    self.imageUploadRequested.emit(buffer.data().data(), "png")
                 return
 
         elif source.hasHtml():
-            # Get the HTML content
-            html = source.html()
-
-            try:
-                # Convert HTML to markdown
-                markdown_text = html_to_markdown(html)
-                # Insert the transformed text
-                self.insertPlainText(markdown_text)
-            except Exception:
-                from bs4 import BeautifulSoup
-
-                soup = BeautifulSoup(html, "html.parser")
-                self.insertPlainText(soup.get_text())
+            # Convert on a worker thread and insert the result where the paste
+            # happened, the cursor follows any edits made in the meantime
+            paste_id = self._next_paste_id
+            self._next_paste_id += 1
+            self._pending_pastes[paste_id] = self.textCursor()
+            job = HtmlToMarkdownJob(source.html(), paste_id, self._content_generation)
+            _ = job.signals.finished.connect(self._insert_pasted_markdown)
+            QThreadPool.globalInstance().start(job)
         else:
             # Fall back to default behavior for non-HTML content
             super().insertFromMimeData(source)
 
+    @Slot(int, int, str)
+    def _insert_pasted_markdown(
+        self, paste_id: int, generation: int, markdown_text: str
+    ) -> None:
+        """Insert the result of a HtmlToMarkdownJob where the paste happened"""
+        cursor = self._pending_pastes.pop(paste_id, None)
+        # The text was replaced (e.g. by another note) during the conversion,
+        # the paste no longer has anywhere to go
+        if cursor is None or generation != self._content_generation:
+            return
+        # Insert the transformed text
+        cursor.insertText(markdown_text)
+        self.setTextCursor(cursor)
+
     def verticalScrollFraction(self) -> float:
         """Return the current vertical scroll position as a fraction (0-1)"""
         scrollbar = self.verticalScrollBar()
@@ -603,6 +734,18 @@ class NoteUrlRequestInterceptor(QWebEngineUrlRequestInterceptor):
     def __init__(self, note_model: NoteModel) -> None:
         super().__init__()
         self.note_model: NoteModel = note_model
+        # Resource ID -> file URL, every render requests the same resources again
+        self._resource_urls: dict[str, QUrl] = {}
+        # Local files known to exist, so repeated requests don't stat them again
+        self._existing_files: set[str] = set()
+        # The files may have changed along with the database (e.g. a refresh
+        # after a sync, or an upload)
+        _ = self.note_model.resources_changed.connect(self.invalidate)
+
+    def invalidate(self) -> None:
+        """Forget the resolved files of every resource"""
+        self._resource_urls.clear()
+        self._existing_files.clear()
 
     @override
     def interceptRequest(self, info: QWebEngineUrlRequestInfo) -> None:
@@ -611,8 +754,11 @@ class NoteUrlRequestInterceptor(QWebEngineUrlRequestInterceptor):
         # Handle local file URLs
         if url.scheme() == "file":
             file_path = url.toLocalFile()
+            if file_path in self._existing_files:
+                return
             if os.path.exists(file_path):
                 # Allow direct access to local files
+                self._existing_files.add(file_path)
                 return
             else:
                 info.block(True)
@@ -620,7 +766,13 @@ class NoteUrlRequestInterceptor(QWebEngineUrlRequestInterceptor):
 
         # Handle note:// URLs
         if url.scheme() == "note":
-            resource_id = url.toString().replace("note://", "")
+            # The id is parsed as the host, take it from the parsed url rather
+            # than serialising the whole url back to a string
+            resource_id = url.host() + url.path()
+
+            if resource_url := self._resource_urls.get(resource_id):
+                info.redirect(resource_url)
+                return
 
             # Start debugging around here
             # print(f"Intercepted request for resource: {resource_id}")
@@ -628,17 +780,12 @@ class NoteUrlRequestInterceptor(QWebEngineUrlRequestInterceptor):
             if table := self.note_model.what_is_this(resource_id):
                 match table:
                     case IdTable.NOTE:
-                        print(
-                            f"Request is a note: {resource_id}, this isn't handled yet, in the future it may transclude the note"
-                        )
-                        note_id = resource_id
-                        _ = note_id
+                        # Not handled yet, in the future it may transclude the note
+                        pass
                     case IdTable.FOLDER:
-                        print(
-                            f"Request is a folder: {resource_id}, this isn't handled yet, in the future it may include a list of the folder contents "
-                        )
-                        folder_id = resource_id
-                        _ = folder_id
+                        # Not handled yet, in the future it may include a list of
+                        # the folder contents
+                        pass
                     # Assume a resource, because the file may exist on disk but not be in database due to a sync issue
                     case _:
                         if filepath := self.note_model.get_resource_path(resource_id):
@@ -646,10 +793,12 @@ class NoteUrlRequestInterceptor(QWebEngineUrlRequestInterceptor):
                             url = QUrl.fromLocalFile(str(filepath))
                             # Start debugging around here
                             # print(f"---> Redirecting to resource file: {url}")
+                            # Only reached once per resource, see _resource_urls
                             if str(filepath).endswith((".mp4")):
                                 print(
                                     "Proprietary video file, this may not display correctly, try converting to webm"
                                 )
+                            self._resource_urls[resource_id] = url
                             info.redirect(url)
                             return
 
@@ -662,6 +811,11 @@ class WebPreview(QWebEngineView):
         # TODO Refactor this so the WebPreview sets the content on construction
         self.content_already_set: bool = False  # Has the content been set?
         self._content_div: str = "markdown"
+        # The compiled in resources can't change at runtime, see _get_css_resources
+        self._css_includes: str | None = None
+        # The page template around the content, see get_html_template
+        self._html_template: tuple[str, str] | None = None
+        self._last_html: str | None = None  # The content last passed to set_html
         self.setPage(NoteLinkPage(parent=self, note_model=note_model))
         self.note_model: NoteModel = note_model
         self.setZoomFactor(1.0)  # Initialize zoom factor
@@ -696,19 +850,13 @@ class WebPreview(QWebEngineView):
         Returns:
             bool: True if the div was found and updated, False otherwise
         """
-        # First check if the div exists
-        check_js = f"""
+        # Check for the div and update it in a single script, rather than
+        # waiting on a round trip to the page between the check and the update
+        update_js = f"""
             (function() {{
-                return document.querySelector(".{div_class}") !== null;
-            }})();
-        """
-
-        # Define callback to handle the result
-        def handle_result(result: bool) -> None:
-            if result:
-                # Div exists, update its content
-                # Improve this to perserve the state of
-                update_js = f"""
+                if (document.querySelector(".{div_class}") === null) {{
+                    return false;
+                }}
                 try {{
                     // Code that may throw an error
                     set_div_content_and_eval("{div_class}", {json.dumps(content)});
@@ -716,24 +864,32 @@ class WebPreview(QWebEngineView):
                     // Code to handle the error
                     console.error("set_div_content does not exist (yet)", error.message);
                 }}
-                    """
-                self.page().runJavaScript(update_js)
-            else:
+                return true;
+            }})();
+        """
+
+        # Define callback to handle the result
+        def handle_result(result: bool) -> None:
+            if not result:
                 # If there is no matching div, set from scratch
                 self.content_already_set = False
                 self.set_html(content)
 
-        # Run the check and handle result
-        self.page().runJavaScript(check_js, resultCallback=handle_result)
+        self.page().runJavaScript(update_js, resultCallback=handle_result)
         self.content_already_set = True
 
     def set_html(self, html: str) -> None:
         if self.content_already_set:
+            # Different markdown can render to the same HTML (e.g. trailing
+            # whitespace), don't send the page an update that changes nothing
+            if html == self._last_html:
+                return
             self.update_content_div(self._content_div, html)
         else:
             content = self.get_html_template(html)
-            self.setHtml(content, QUrl("note://"))
+            self.setHtml(content, NOTE_BASE_URL)
             self.content_already_set = True
+        self._last_html = html
 
         # DEBUG
         # def cb(result: str) -> None:
@@ -749,24 +905,42 @@ class WebPreview(QWebEngineView):
 
         picked up the static css asset, then it will be included.
 
+        The resources are compiled in, so they are only listed once and the
+        result is reused for every page.
         """
-        css_links: list[str] = []
+        if self._css_includes is not None:
+            return self._css_includes
+        css_paths: list[str] = []
         it = QDirIterator(
             ":/css", QDir.Filter.Files, QDirIterator.IteratorFlag.Subdirectories
         )
         while it.hasNext():
-            file_path = it.next()
-            if "vector" in file_path:
-                continue
-            css_links.append(f'<link rel="stylesheet" href="qrc{file_path}">')
+            css_paths.append(it.next())
+        css_links = [
+            f'<link rel="stylesheet" href="qrc{file_path}">'
+            for file_path in css_paths
+            if "vector" not in file_path
+        ]
 
         # If needed to debug
         # print(css_links)
         # sys.exit()
 
-        return "\n".join(css_links)
+        self._css_includes = "\n".join(css_links)
+        return self._css_includes
 
     def get_html_template(self, html: str = "PLACEHOLDER_CONTENT") -> str:
+        # Only the content changes between pages, so the template around it
+        # is built once and split into the parts before and after the content
+        if self._html_template is None:
+            prefix, _, suffix = self._build_html_template().partition(
+                "PLACEHOLDER_CONTENT"
+            )
+            self._html_template = (prefix, suffix)
+        prefix, suffix = self._html_template
+        return prefix + html + suffix
+
+    def _build_html_template(self) -> str:
         # Allow direct file:// URLs to pass through
         css_includes = self._get_css_resources()
         html = f"""<!DOCTYPE html>
@@ -801,7 +975,7 @@ class WebPreview(QWebEngineView):
             </style>
         </head>
         <body><div class="markdown">
-            {html}
+            PLACEHOLDER_CONTENT
             </div>
             <script src="qrc:/katex/katex.min.js"></script>
             <script src="qrc:/js/pdfjs.js"></script>
@@ -890,247 +1064,91 @@ class WebPreview(QWebEngineView):
     def rewrite_html_links(self, html: str) -> str:
         """Rewrite HTML links to use the note:// scheme based on their target type.
 
+        Sources (e.g. <img src=":/{id}">) are always rewritten to note://{id}.
+
         Args:
             html: The input HTML containing links in the format <a href=":/{id}">{title}</a>
 
         Returns:
             HTML with rewritten links using appropriate schemes based on target type
         """
-        from bs4 import BeautifulSoup
-
-        soup = BeautifulSoup(html, "html.parser")
-
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            if href.startswith(":/"):
-                resource_id = href[2:]  # Remove the :/ prefix
-
-                # Fall back to resource, folders and notes are undefined without a db
-                # entry. However an asset may be on disk without a db entry due to
-                # a sync error, so this deals with that
-                id_type = self.note_model.what_is_this(resource_id) or IdTable.RESOURCE
+        # Prose without internal links or sources needs no rewriting at all
+        if '":/' not in html:
+            return html
+        # Most links only need their href rewritten, do that with a regex and
+        # only build markup for the links that are replaced by an embed
+        # Resource ID -> (MIME type, resource type, path) of each embed, found
+        # while rewriting so the embeds don't need to look them up again
+        embeds: dict[str, tuple[str | None, ResourceType, Path]] = {}
+        # Documents often link the same id repeatedly, only look each one up once
+        link_targets: dict[str, str] = {}
+        # Classify every linked id up front, rather than querying them one by one
+        id_types = self.note_model.what_are_these(
+            list(
+                {
+                    m.group(2)
+                    for m in NOTE_LINK_RE.finditer(html)
+                    if m.group(1).startswith("<a")
+                }
+            )
+        )
 
-                match id_type:
-                    case IdTable.NOTE:
-                        link["href"] = f"note://{resource_id}"
-                    case IdTable.FOLDER:
-                        link["href"] = f"note://{resource_id}"
-                    case IdTable.RESOURCE:
-                        if filepath := self.note_model.get_resource_path(
-                            resource_id
-                        ):
-                            # Filepath isn't used, but it may be useful in the future
-                            _ = filepath
-                            # Handle different resource types appropriately
-                            mime_type = self.note_model.get_resource_mime_type(
-                                resource_id
-                            )[1]
-                            match mime_type:
-                                case ResourceType.IMAGE:
-                                    link["href"] = f"note://{resource_id}"
-                                case ResourceType.VIDEO:
-                                    # Get the link text and title
-                                    link_text = link.string or "Video"
-                                    title = link.get("title", "")
-                                    mime_type_string = (
-                                        self.note_model.get_resource_mime_type(
-                                            resource_id
-                                        )[0]
-                                    )
-
-                                    # Create the link for the summary
-                                    summary_link = soup.new_tag("a")
-                                    summary_link.string = link_text
-                                    summary_link["href"] = f"note://{resource_id}"
-                                    summary_link["title"] = title
-                                    summary_link["data-from-md"] = ""
-                                    summary_link["data-resource-id"] = resource_id
-                                    summary_link["type"] = (
-                                        f"video/{mime_type_string}"
-                                    )
-
-                                    # Create video element
-                                    video_tag = soup.new_tag(
-                                        "video",
-                                        **{
-                                            "class": "media-player media-video",
-                                            "controls": "",
-                                        },
-                                    )
-                                    source_tag = soup.new_tag(
-                                        "source",
-                                        src=f":/{resource_id}",
-                                        type=f"{mime_type_string}",
-                                    )
-                                    video_tag.append(source_tag)
-
-                                    # Replace the original link with the new structure
-                                    link.replace_with(
-                                        wrap_in_details(
-                                            soup, summary_link, video_tag
-                                        )
-                                    )
-                                case ResourceType.PDF:
-                                    # Get the link text and title
-                                    link_text = link.string or "PDF Document"
-                                    title = link.get("title", "")
-                                    mime_type_string = (
-                                        self.note_model.get_resource_mime_type(
-                                            resource_id
-                                        )[0]
-                                    )
-
-                                    # Create the link for the summary
-                                    summary_link = soup.new_tag("a")
-                                    summary_link.string = link_text
-                                    summary_link["href"] = f"note://{resource_id}"
-                                    summary_link["title"] = title
-                                    summary_link["data-from-md"] = ""
-                                    summary_link["data-resource-id"] = resource_id
-                                    if mime_type_string:
-                                        summary_link["type"] = mime_type_string
-
-                                    # Create PDF preview container
-                                    pdf_container = soup.new_tag(
-                                        "div",
-                                        **{
-                                            "class": "pdfjs_preview",
-                                            "data-src": f":/{resource_id}",
-                                        },
-                                    )
-                                    placeholder = soup.new_tag(
-                                        "div", **{"class": "placeholder"}
-                                    )
-                                    placeholder.string = "Loading PDF preview..."
-                                    pdf_container.append(placeholder)
-
-                                    # Replace the original link with the new structure
-                                    link.replace_with(
-                                        wrap_in_details(
-                                            soup, summary_link, pdf_container
-                                        )
-                                    )
-                                case ResourceType.AUDIO:
-                                    # Get the link text and title
-                                    link_text = link.string or "Audio"
-                                    title = link.get("title", "")
-                                    mime_type_string = (
-                                        self.note_model.get_resource_mime_type(
-                                            resource_id
-                                        )[0]
-                                    )
-
-                                    # Create the link for the summary
-                                    summary_link = soup.new_tag("a")
-                                    summary_link.string = link_text
-                                    summary_link["href"] = f"note://{resource_id}"
-                                    summary_link["title"] = title
-                                    summary_link["data-from-md"] = ""
-                                    summary_link["data-resource-id"] = resource_id
-                                    if mime_type_string:
-                                        summary_link["type"] = mime_type_string
-
-                                    # Create audio element
-                                    audio_tag = soup.new_tag(
-                                        "audio",
-                                        **{
-                                            "class": "media-player media-audio",
-                                            "controls": "",
-                                        },
-                                    )
-                                    source_tag = soup.new_tag(
-                                        "source",
-                                        src=f":/{resource_id}",
-                                        type=f"{mime_type_string}",
-                                    )
-                                    audio_tag.append(source_tag)
-
-                                    # Replace the original link with the new structure
-                                    link.replace_with(
-                                        wrap_in_details(
-                                            soup, summary_link, audio_tag
-                                        )
-                                    )
-                                case ResourceType.CODE:
-                                    # Get the link text and title
-                                    link_text = link.string or "Code File"
-                                    title = link.get("title", "")
-                                    mime_type_string = (
-                                        self.note_model.get_resource_mime_type(
-                                            resource_id
-                                        )[0]
-                                    )
-
-                                    # Create the link for the summary
-                                    summary_link = soup.new_tag("a")
-                                    summary_link.string = link_text
-                                    summary_link["href"] = f"note://{resource_id}"
-                                    summary_link["title"] = title
-                                    summary_link["data-from-md"] = ""
-                                    summary_link["data-resource-id"] = resource_id
-                                    if mime_type_string:
-                                        summary_link["type"] = mime_type_string
-
-                                    # Create code block container
-                                    code_container = soup.new_tag(
-                                        "pre",
-                                        **{
-                                            "class": "code-block",
-                                            "data-src": f":/{resource_id}",
-                                        },
-                                    )
-                                    # TODO syntax highlighting isn't working, fix this
-                                    # Get file extension for syntax highlighting
-                                    filepath = self.note_model.get_resource_path(
-                                        resource_id
-                                    )
-                                    ext = filepath.suffix[1:] if filepath else None
-                                    lang_class = (
-                                        get_language_class(ext) if ext else None
-                                    )
-
-                                    code_tag = soup.new_tag("code")
-                                    if lang_class:
-                                        code_tag["class"] = lang_class
-
-                                    if filepath:
-                                        try:
-                                            with open(
-                                                filepath, "r", encoding="utf-8"
-                                            ) as f:
-                                                code_content = f.read()
-                                            code_tag.string = code_content
-                                        except Exception as e:
-                                            error_div = soup.new_tag(
-                                                "div", **{"class": "error"}
-                                            )
-                                            error_div.string = (
-                                                f"Error loading code: {str(e)}"
-                                            )
-                                            code_tag.append(error_div)
-                                    else:
-                                        error_div = soup.new_tag(
-                                            "div", **{"class": "error"}
-                                        )
-                                        error_div.string = "Code file not found"
-                                        code_tag.append(error_div)
-
-                                    code_container.append(code_tag)
-
-                                    # Replace the original link with the new structure
-                                    link.replace_with(
-                                        wrap_in_details(
-                                            soup, summary_link, code_container
-                                        )
-                                    )
-                                case ResourceType.DOCUMENT:
-                                    link["href"] = f"note://{resource_id}"
-                                case ResourceType.ARCHIVE:
-                                    link["href"] = f"note://{resource_id}"
-                                case ResourceType.OTHER:
-                                    link["href"] = f"note://{resource_id}"
-
-        return str(soup)
+        def get_link_target(resource_id: str) -> str:
+            # Fall back to resource, folders and notes are undefined without a db
+            # entry. However an asset may be on disk without a db entry due to
+            # a sync error, so this deals with that
+            id_type = id_types.get(resource_id, IdTable.RESOURCE)
+            if id_type == IdTable.RESOURCE:
+                if not (filepath := self.note_model.get_resource_path(resource_id)):
+                    return f":/{resource_id}"
+                mime_type_string, resource_type = (
+                    self.note_model.get_resource_mime_type(resource_id)
+                )
+                if resource_type in EMBED_RENDERERS:
+                    embeds[resource_id] = (mime_type_string, resource_type, filepath)
+                    return f":/{resource_id}"
+            return f"note://{resource_id}"
+
+        def rewrite_link(m: re.Match[str]) -> str:
+            prefix, resource_id = m.group(1), m.group(2)
+            # Sources (e.g. images) are always resolved by the interceptor
+            if not prefix.startswith("<a"):
+                return f'{prefix}note://{resource_id}"'
+            if resource_id not in link_targets:
+                link_targets[resource_id] = get_link_target(resource_id)
+            return f'{prefix}{link_targets[resource_id]}"'
+
+        html = NOTE_LINK_RE.sub(rewrite_link, html)
+        if not embeds:
+            return html
+
+        def embed_link(m: re.Match[str]) -> str:
+            attributes, resource_id, link_text = m.group(1), m.group(2), m.group(3)
+            # Links to missing resources are left as they are
+            if not (resource := embeds.get(resource_id)):
+                return m.group(0)
+            mime_type_string, resource_type, filepath = resource
+            default_link_text, render = EMBED_RENDERERS[resource_type]
+
+            # Create the link for the summary, the markup is built as a string
+            # rather than parsing the link and building a tree for it
+            title_match = TITLE_RE.search(attributes)
+            title = title_match.group(1) if title_match else ""
+            type_attribute = (
+                f' type="{escape(mime_type_string)}"' if mime_type_string else ""
+            )
+            summary_link = (
+                f'<a data-from-md="" data-resource-id="{escape(resource_id)}"'
+                f' href="note://{escape(resource_id)}" title="{title}"{type_attribute}>'
+                f"{link_text.strip() or default_link_text}</a>"
+            )
+
+            content = render(resource_id, mime_type_string, filepath)
+
+            return wrap_in_details(summary_link, content)
+
+        # Every other internal link has already been rewritten above
+        return EMBED_LINK_RE.sub(embed_link, html)
 
 
 class NoteLinkPage(QWebEnginePage):
@@ -1158,7 +1176,7 @@ class NoteLinkPage(QWebEnginePage):
         # Handle the navigation request
         if url.scheme() == "note":
             # Extract ID from URL by removing scheme and host
-            id = url.toString().replace("note://", "").strip("/")
+            id = (url.host() + url.path()).strip("/")
 
             if (id_type := self.note_model.what_is_this(id)) is not None:
                 match id_type:
@@ -1168,53 +1186,23 @@ class NoteLinkPage(QWebEnginePage):
                             ItemType.NOTE, note_id, "Title Omitted, not needed Here"
                         )
                         self.parent().note_selected.emit(item_data)
-                        print(f"Note link clicked! ID: {note_id}")
                     case IdTable.FOLDER:
-                        folder_id = id
-                        print(f"Folder link clicked! ID: {folder_id}")
+                        # Folder links aren't handled yet
+                        pass
                     case IdTable.RESOURCE:
                         resource_id = id
                         resource_path = self.note_model.get_resource_path(resource_id)
-                        # DEBUG
-                        # print(f"Resource link clicked! ID: {resource_id}")
-
-                        def try_open(resource_path: Path | None) -> None:
-                            if resource_path is not None:
-                                from PySide6.QtWidgets import QApplication
-
-                                clipboard = QApplication.clipboard()
-                                clipboard.setText(str(resource_path))
-                                open_file(resource_path)
-                            else:
-                                print(f"Resource ID: {resource_id} does not exist")
-
-                        match self.note_model.get_resource_mime_type(resource_id)[
-                            1
-                        ]:  # Get just the ResourceType
-                            case ResourceType.IMAGE:
-                                print(f"Image resource clicked: {resource_id}")
-                                try_open(resource_path)
-                            case ResourceType.VIDEO:
-                                try_open(resource_path)
-                            case ResourceType.AUDIO:
-                                try_open(resource_path)
-                            case ResourceType.DOCUMENT:
-                                try_open(resource_path)
-                            case ResourceType.ARCHIVE:
-                                try_open(resource_path)
-                            case ResourceType.CODE:
-                                try_open(resource_path)
-                            case ResourceType.PDF:
-                                try_open(resource_path)
-                            case ResourceType.OTHER:
-                                try_open(resource_path)
-                            case ResourceType.HTML:
-                                try_open(resource_path)
-                            case _:  # pyright: ignore [reportUnnecessaryComparison]
-                                print(
-                                    f"Resource type not recognized: {self.note_model.get_resource_mime_type(resource_id)[1]}"
-                                )
-                                try_open(resource_path)
+
+                        # Every type of resource is opened externally, so
+                        # there's no need to look up its mime type
+                        if resource_path is not None:
+                            from PySide6.QtWidgets import QApplication
+
+                            clipboard = QApplication.clipboard()
+                            clipboard.setText(str(resource_path))
+                            open_file(resource_path)
+                        else:
+                            print(f"Resource ID: {resource_id} does not exist")
 
             else:
                 # This would depend if we can safely create a new note with the ID, not sure on the impact of changing note ids
@@ -1227,78 +1215,155 @@ class NoteLinkPage(QWebEnginePage):
         return True
 
     def requestedUrl(self) -> QUrl:
-        return QUrl("note://")
+        return NOTE_BASE_URL
+
+
+# File extension -> language used in the class of embedded code blocks
+LANGUAGES = {
+    "py": "python",
+    "python": "python",
+    "js": "javascript",
+    "javascript": "javascript",
+    "html": "html",
+    "r": "r",
+    "rmd": "r",
+    "sh": "bash",
+    "css": "css",
+    "cpp": "cpp",
+    "c": "cpp",
+    "java": "java",
+    "json": "json",
+    "sql": "sql",
+    "yaml": "yaml",
+    "yml": "yaml",
+    "xml": "xml",
+    "md": "markdown",
+    "tex": "latex",
+}
 
 
 def get_language_class(ext: str) -> str | None:
-    ext = ext.lower()
-    lang_string = None
-    match ext:
-        case "py" | "python":
-            lang_string = "python"
-        case "js" | "javascript":
-            lang_string = "javascript"
-        case "html":
-            lang_string = "html"
-        case "r" | "rmd":
-            lang_string = "r"
-        case "sh":
-            lang_string = "bash"
-        case "css":
-            lang_string = "css"
-        case "cpp" | "c":
-            lang_string = "cpp"
-        case "java":
-            lang_string = "java"
-        case "json":
-            lang_string = "json"
-        case "sql":
-            lang_string = "sql"
-        case "yaml" | "yml":
-            lang_string = "yaml"
-        case "xml":
-            lang_string = "xml"
-        case "md":
-            lang_string = "markdown"
-        case "tex":
-            lang_string = "latex"
-
-    return f"language-{lang_string}"
-
-
-def wrap_in_details(soup: BeautifulSoup, summary_link: Tag, content_tag: Tag) -> Tag:
-    details_tag = soup.new_tag("details", open="")
-    summary_tag = soup.new_tag("summary")
-    summary_tag.append(summary_link)
-    details_tag.append(summary_tag)
-    details_tag.append(content_tag)
-    return details_tag
+    lang_string = LANGUAGES.get(ext.lower())
+    return f"language-{lang_string}" if lang_string else None
+
+
+def wrap_in_details(summary_link: str, content: str) -> str:
+    return f'<details open=""><summary>{summary_link}</summary>{content}</details>'
+
+
+def render_source(resource_id: str, mime_type_string: str | None) -> str:
+    src = escape(f"note://{resource_id}")
+    mime_type = escape(str(mime_type_string))
+    return f'<source src="{src}" type="{mime_type}"/>'
+
+
+def render_video(
+    resource_id: str, mime_type_string: str | None, filepath: Path | None
+) -> str:
+    _ = filepath  # Unused
+    return (
+        '<video class="media-player media-video" controls="">'
+        f"{render_source(resource_id, mime_type_string)}</video>"
+    )
+
+
+def render_pdf(
+    resource_id: str, mime_type_string: str | None, filepath: Path | None
+) -> str:
+    _ = mime_type_string, filepath  # Unused
+    # Create PDF preview container
+    return (
+        f'<div class="pdfjs_preview" data-src="note://{escape(resource_id)}">'
+        '<div class="placeholder">Loading PDF preview...</div>'
+        "</div>"
+    )
+
+
+def render_audio(
+    resource_id: str, mime_type_string: str | None, filepath: Path | None
+) -> str:
+    _ = filepath  # Unused
+    return (
+        '<audio class="media-player media-audio" controls="">'
+        f"{render_source(resource_id, mime_type_string)}</audio>"
+    )
+
+
+def read_code_file(filepath: Path) -> tuple[str, bool]:
+    """Read an embedded code file, up to MAX_INLINE_CODE_BYTES
+
+    The content is cached until the file's modification time or size changes,
+    so re-rendering a note doesn't read its embedded files again.
+
+    Returns:
+        The decoded content and whether it was truncated
+    """
+    stat = filepath.stat()
+    return read_code_file_cached(str(filepath), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=32)
+def read_code_file_cached(path: str, mtime_ns: int, size: int) -> tuple[str, bool]:
+    """See read_code_file, mtime_ns and size are only used as part of the key"""
+    _ = mtime_ns, size
+    with open(path, "rb") as f:
+        data = f.read(MAX_INLINE_CODE_BYTES + 1)
+    truncated = len(data) > MAX_INLINE_CODE_BYTES
+    return data[:MAX_INLINE_CODE_BYTES].decode("utf-8", errors="replace"), truncated
+
+
+def render_code(
+    resource_id: str, mime_type_string: str | None, filepath: Path | None
+) -> str:
+    _ = mime_type_string  # Unused
+    # TODO syntax highlighting isn't working, fix this
+    # Get file extension for syntax highlighting
+    ext = filepath.suffix[1:] if filepath else None
+    lang_class = get_language_class(ext) if ext else None
+    class_attribute = f' class="{escape(lang_class)}"' if lang_class else ""
+
+    if filepath:
+        try:
+            code_content, truncated = read_code_file(filepath)
+            # Quotes only need escaping inside attributes, not in element content
+            code = escape(code_content, quote=False)
+            if truncated:
+                code += (
+                    '<div class="error">Only the first '
+                    f"{MAX_INLINE_CODE_BYTES // 1024} KiB are shown</div>"
+                )
+        except Exception as e:
+            code = f'<div class="error">Error loading code: {escape(str(e))}</div>'
+    else:
+        code = '<div class="error">Code file not found</div>'
+
+    # Create code block container
+    return (
+        f'<pre class="code-block" data-src="note://{escape(resource_id)}">'
+        f"<code{class_attribute}>{code}</code>"
+        "</pre>"
+    )
+
+
+# Resources that are embedded in the preview rather than linked to, mapped to
+# the default text of their summary link and the function that renders them
+EMBED_RENDERERS: dict[
+    ResourceType, tuple[str, Callable[[str, str | None, Path | None], str]]
+] = {
+    ResourceType.VIDEO: ("Video", render_video),
+    ResourceType.PDF: ("PDF Document", render_pdf),
+    ResourceType.AUDIO: ("Audio", render_audio),
+    ResourceType.CODE: ("Code File", render_code),
+}
 
 
 def open_file(file_path: Path | str) -> None:
+    """Open a file with the system's default application"""
     if isinstance(file_path, Path):
         file_path = str(file_path)
-    """Open a file with the system's default application"""
     if platform.system() == "Windows":
         os.startfile(file_path)  # type:ignore [attr-defined]
-    elif platform.system() == "Darwin":  # macOS
-        out = subprocess.run(["open", file_path])
-        if out.returncode != 0:
-            print(f"Error opening file: {out.stderr}")
-    else:  # Linux and other Unix systems
-        out = subprocess.run(["xdg-open", file_path])
-        if out.returncode != 0:
-            print(f"Error opening file: {out.stderr}")
-
-
-SVG_VIDEO = """
-<svg
-        xmlns="http://www.w3.org/2000/svg"
-        fill="currentColor"
-        class="bi bi-globe"
-        viewBox="0 0 16 16"
-      >
-        <path
-          d="M0 8a8 8 0 1 1 16 0A8 8 0 0 1 0 8zm7.5-6.923c-.67.204-1.335.82-1.887 1.855A7.97 7.97 0 0 0 5.145 4H7.5V1.077zM4.09 4a9.267 9.267 0 0 1 .64-1.539 6.7 6.7 0 0 1 .597-.933A7.025 7.025 0 0 0 2.255 4H4.09zm-.582 3.5c.03-.877.138-1.718.312-2.5H1.674a6.958 6.958 0 0 0-.656 2.5h2.49zM4.847 5a12.5 12.5 0 0 0-.338 2.5H7.5V5H4.847zM8.5 5v2.5h2.99a12.495 12.495 0 0 0-.337-2.5H8.5zM4.51 8.5a12.5 12.5 0 0 0 .337 2.5H7.5V8.5H4.51zm3.99 0V11h2.653c.187-.765.306-1.608.338-2.5H8.5zM5.145 12c.138.386.295.744.468 1.068.552 1.035 1.218 1.65 1.887 1.855V12H5.145zm.182 2.472a6.696 6.696 0 0 1-.597-.933A9.268 9.268 0 0 1 4.09 12H2.255a7.024 7.024 0 0 0 3.072 2.472zM3.82 11a13.652 13.652 0 0 1-.312-2.5h-2.49c.062.89.291 1.733.656 2.5H3.82zm6.853 3.472A7.024 7.024 0 0 0 13.745 12H11.91a9.27 9.27 0 0 1-.64 1.539 6.688 6.688 0 0 1-.597.933zM8.5 12v2.923c.67-.204 1.335-.82 1.887-1.855.173-.324.33-.682.468-1.068H8.5zm3.68-1h2.146c.365-.767.594-1.61.656-2.5h-2.49a13.65 13.65 0 0 1-.312 2.5zm2.802-3.5a6.959 6.959 0 0 0-.656-2.5H12.18c.174.782.282 1.623.312 2.5h2.49zM11.27 2.461c.247.464.462.98.64 1.539h1.835a7.024 7.024 0 0 0-3.072-2.472c.218.284.418.598.597.933zM10.855 4a7.966 7.966 0 0 0-.468-1.068C9.835 1.897 9.17 1.282 8.5 1.077V4h2.355z"
-        ></path></svg>
-"""
+    # macOS, Linux and other Unix systems. Qt hands the file to the desktop's
+    # launcher (open, xdg-open, ...) without blocking until it has started
+    elif not QDesktopServices.openUrl(QUrl.fromLocalFile(file_path)):
+        print(f"Error opening file: {file_path}")
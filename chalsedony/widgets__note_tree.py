@@ -1,17 +1,31 @@
 from typing import Callable, Dict, List, Optional
 import time
 from pydantic import BaseModel
-from PySide6.QtCore import Qt, QPoint, Signal
-from PySide6.QtWidgets import QTreeWidgetItem, QStyle, QTreeWidget
+from PySide6.QtCore import (
+    Qt,
+    QModelIndex,
+    QPersistentModelIndex,
+    QPoint,
+    Signal,
+)
+from PySide6.QtWidgets import (
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+    QTreeWidgetItem,
+    QStyle,
+    QTreeWidget,
+)
 from .widgets__kbd_widgets import TreeWidgetWithCycle
 
 from PySide6.QtGui import (
     QAction,
     QDragEnterEvent,
+    QDragLeaveEvent,
     QDragMoveEvent,
     QDropEvent,
     QKeyEvent,
     QMouseEvent,
+    QPainter,
 )
 from PySide6.QtWidgets import (
     QWidget,
@@ -281,12 +295,23 @@ class NoteTree(TreeWidgetWithCycle, StatefulTree):
         full_title = self.note_model.get_folder_path(folder_id)
         self.send_status_message(f"Created new note in folder: {full_title}")
 
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        self.drag_drop_handler.mousePressEvent(event)
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        self.drag_drop_handler.mouseReleaseEvent(event)
+        super().mouseReleaseEvent(event)
+
     def dragEnterEvent(self, event: QDragEnterEvent) -> None:
         self.drag_drop_handler.dragEnterEvent(event)
 
     def dragMoveEvent(self, event: QDragMoveEvent) -> None:
         self.drag_drop_handler.dragMoveEvent(event)
 
+    def dragLeaveEvent(self, event: QDragLeaveEvent) -> None:
+        self.drag_drop_handler.dragLeaveEvent(event)
+
     def dropEvent(self, event: QDropEvent) -> None:
         self.drag_drop_handler.dropEvent(event)
 
@@ -508,13 +533,10 @@ class NoteTree(TreeWidgetWithCycle, StatefulTree):
                 # Hide if no visible children and no match
                 item.setHidden(not (item_matches or visible_children > 0))
                 # Expand if this folder or any children match
+                # Parent folders don't need to be walked up to here, they see
+                # this folder's match as a child match and expand themselves
                 if item_matches or child_matches:
                     item.setExpanded(True)
-                    # Also expand parent folders up to root
-                    parent = item.parent()
-                    while parent:
-                        parent.setExpanded(True)
-                        parent = parent.parent()
             else:
                 # For notes (leaf items), hide if no match
                 item.setHidden(not item_matches)
@@ -600,12 +622,33 @@ class NoteTree(TreeWidgetWithCycle, StatefulTree):
             self.note_swap_order.emit(current_data.id, below_data.id)
 
 
+class DropTargetDelegate(QStyledItemDelegate):
+    """Paints the drop highlight behind the folder hovered during a drag"""
+
+    def __init__(self, drag_drop_handler: "DragDropHandler") -> None:
+        super().__init__(drag_drop_handler.tree_widget)
+        self.drag_drop_handler = drag_drop_handler
+
+    def paint(
+        self,
+        painter: QPainter,
+        option: QStyleOptionViewItem,
+        index: QModelIndex | QPersistentModelIndex,
+    ) -> None:
+        if index == self.drag_drop_handler.hover_index:
+            painter.fillRect(option.rect, option.palette.highlight())
+        super().paint(painter, option, index)
+
+
 class DragDropHandler:
     """Handles drag and drop operations for tree widgets"""
 
     def __init__(self, tree_widget: NoteTree) -> None:
         self.tree_widget = tree_widget
-        self._hover_item: QTreeWidgetItem | None = None
+        # The row under the mouse during a drag, painted by DropTargetDelegate
+        # The model isn't modified mid-drag, so a plain index stays valid. It's
+        # cleared whenever the drag leaves or drops, before the tree is rebuilt
+        self.hover_index = QModelIndex()
         self._dragged_item: QTreeWidgetItem | None = None
 
         # Configure tree widget for drag and drop
@@ -614,53 +657,80 @@ class DragDropHandler:
         self.tree_widget.setDropIndicatorShown(True)
         self.tree_widget.setDragDropMode(QTreeWidget.DragDropMode.InternalMove)
         self.tree_widget.setSelectionMode(QTreeWidget.SelectionMode.SingleSelection)
+        self.tree_widget.setItemDelegate(DropTargetDelegate(self))
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        """Remember the item under the press, it's the one a drag would move"""
+        self._dragged_item = self.tree_widget.itemAt(event.position().toPoint())
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        """Forget the pressed item, a plain click doesn't start a drag"""
+        _ = event  # Unused
+        self._dragged_item = None
+
+    def _is_internal_drag(self, event: QDropEvent) -> bool:
+        """Whether the event belongs to a drag of the pressed item in this tree
+
+        The pressed item is only meaningful for drags started by this tree, a
+        drag from elsewhere must not pick up an item left over from an earlier
+        press, which may have been deleted by a refresh since.
+        """
+        return event.source() is self.tree_widget and self._dragged_item is not None
 
     def dragEnterEvent(self, event: QDragEnterEvent) -> None:
         """Handle drag enter event"""
-        self._dragged_item = self.tree_widget.currentItem()
-        if self._dragged_item:
+        if self._is_internal_drag(event):
             event.acceptProposedAction()
 
+    def _set_hover_index(self, index: QModelIndex) -> None:
+        """Move the drop highlight, repainting only the two affected rows"""
+        viewport = self.tree_widget.viewport()
+        if self.hover_index.isValid():
+            viewport.update(self.tree_widget.visualRect(self.hover_index))
+        self.hover_index = index
+        if index.isValid():
+            viewport.update(self.tree_widget.visualRect(index))
+
     def dragMoveEvent(self, event: QDragMoveEvent) -> None:
         """Handle drag move event with hover highlighting"""
-        if not self._dragged_item:
+        if not self._is_internal_drag(event):
             event.ignore()
             return
 
-        # Get item under mouse
-        item = self.tree_widget.itemAt(event.position().toPoint())
+        # Get the row under mouse
+        index = self.tree_widget.indexAt(event.position().toPoint())
 
-        # Only allow dropping on folders
-        if item:
-            item_data: TreeItemData = item.data(0, Qt.ItemDataRole.UserRole)
-            match item_data.type:
-                case ItemType.FOLDER:
-                    pass  # Allow drop on folders
-                case _:
+        # The hovered row was already validated when it was highlighted,
+        # so only inspect the item data when the mouse moves to a new row
+        if index != self.hover_index:
+            # Only allow dropping on folders
+            if index.isValid():
+                item_data: TreeItemData = index.data(Qt.ItemDataRole.UserRole)
+                if item_data.type is not ItemType.FOLDER:
                     event.ignore()
                     return
 
-        # Update hover highlight
-        if item != self._hover_item:
-            if self._hover_item:
-                self._hover_item.setBackground(0, self.tree_widget.palette().base())
-            if item:
-                item.setBackground(0, self.tree_widget.palette().highlight())
-            self._hover_item = item
+            # Update hover highlight
+            self._set_hover_index(index)
 
         event.acceptProposedAction()
 
+    def dragLeaveEvent(self, event: QDragLeaveEvent) -> None:
+        """Clear the hover highlight when the drag leaves or is cancelled"""
+        _ = event  # Unused
+        self._set_hover_index(QModelIndex())
+
     def dropEvent(self, event: QDropEvent) -> None:
         """Handle drop event to move folders"""
-        if not self._dragged_item:
+        # Clear hover highlight, whether or not the drop is accepted
+        self._set_hover_index(QModelIndex())
+
+        # The drag is over either way, so don't keep the item past this drop
+        dragged_item, self._dragged_item = self._dragged_item, None
+        if event.source() is not self.tree_widget or dragged_item is None:
             event.ignore()
             return
 
-        # Clear hover highlight
-        if self._hover_item:
-            self._hover_item.setBackground(0, self.tree_widget.palette().base())
-            self._hover_item = None
-
         # Get the target item under the mouse
         target_item = self.tree_widget.itemAt(event.position().toPoint())
         if not target_item:
@@ -668,9 +738,7 @@ class DragDropHandler:
             return
 
         # Get item types and IDs
-        dragged_data: TreeItemData = self._dragged_item.data(
-            0, Qt.ItemDataRole.UserRole
-        )
+        dragged_data: TreeItemData = dragged_item.data(0, Qt.ItemDataRole.UserRole)
         target_data: TreeItemData = target_item.data(0, Qt.ItemDataRole.UserRole)
 
         # Handle invalid operations
@@ -680,13 +748,13 @@ class DragDropHandler:
             event.ignore()
             return None
         # Invalid assignment
-        if target_data.type != ItemType.FOLDER:
-            match (dragged_data.type, target_data.type):
-                case (ItemType.FOLDER, ItemType.NOTE):
+        if target_data.type is not ItemType.FOLDER:
+            if target_data.type is ItemType.NOTE:
+                if dragged_data.type is ItemType.FOLDER:
                     self.tree_widget.send_status_message(
                         "Cannot drop folders onto notes"
                     )
-                case (ItemType.NOTE, ItemType.NOTE):
+                elif dragged_data.type is ItemType.NOTE:
                     self.tree_widget.send_status_message(
                         "Cannot drop notes onto other notes"
                     )
@@ -704,9 +772,6 @@ class DragDropHandler:
             case _:
                 event.ignore()
 
-        # Reset dragged item
-        self._dragged_item = None
-
     def _move_folder(self, folder_id: str, new_parent_id: str) -> None:
         """Move a folder to a new parent folder"""
         self.tree_widget.folder_moved.emit(folder_id, new_parent_id)
@@ -82,6 +82,7 @@ class NoteListWidget(KbdListWidget):
         # TODO this should store the widget like the tree for fast lookup
         # Not needed righ now though.
         self.current_note_items: dict[str, str] = dict()
+        self._current_results: List[NoteSearchResult] = []
 
     def _connect_signals(self) -> None:
         """Connect internal signals"""
@@ -102,18 +103,53 @@ class NoteListWidget(KbdListWidget):
                 self.item_selection_changed.emit(item_data)
 
     def populate(self, note_items: List[NoteSearchResult]) -> None:
-        """Populate the all notes list view with optional search filtering"""
+        """Populate the all notes list view with optional search filtering
+
+        Existing rows are updated in place and only the difference in length
+        is added or removed, so the list items aren't recreated on every call.
+        Like clearing the list, this always resets the selection.
+        """
+        # Nothing to do if the list already shows these notes in this order
+        if note_items == self._current_results:
+            self._reset_selection()
+            # Show any rows hidden by filter_items, as the reuse path does
+            for i in range(self.count()):
+                if item := self.item(i):
+                    item.setHidden(False)
+            return
+        self._current_results = list(note_items)
         self.current_note_items = {id: deepcopy(note) for id, note in note_items}
-        self.clear()
         # Block signals
         self.blockSignals(True)
         try:
-            for result in note_items:
+            # Reused rows would otherwise stay selected, now showing other notes
+            self.clearSelection()
+            self.setCurrentRow(-1)
+            # Reuse the rows that are already in the list
+            reused = min(self.count(), len(note_items))
+            for row, result in enumerate(note_items[:reused]):
+                if item := self.item(row):
+                    item.setText(result.title)
+                    item.setData(Qt.ItemDataRole.UserRole, result.id)
+                    item.setHidden(False)
+            # Drop the surplus rows, or add the missing ones
+            while self.count() > len(note_items):
+                _ = self.takeItem(self.count() - 1)
+            for result in note_items[reused:]:
                 self.add_item(result)
         finally:
             # Unblock signals
             self.blockSignals(False)
 
+    def _reset_selection(self) -> None:
+        """Clear the selection and current row without emitting a selection"""
+        self.blockSignals(True)
+        try:
+            self.clearSelection()
+            self.setCurrentRow(-1)
+        finally:
+            self.blockSignals(False)
+
     def filter_items(self, filter_text: str) -> None:
         """Filter list items using n-gram comparison"""
         for i in range(self.count()):
@@ -221,19 +221,24 @@ class StatefulTree(QTreeWidget):
             List of TreeItemData for each expanded item
         """
 
-        def collect_expanded(items: List[QTreeWidgetItem]) -> List[TreeItemData]:
-            result = []
-            for item in items:
-                if item.isExpanded():
-                    result.append(cast(TreeWidgetItem, item).item_data)
-                result.extend(
-                    collect_expanded([item.child(i) for i in range(item.childCount())])
-                )
-            return result
-
-        return collect_expanded(
-            [self.topLevelItem(i) for i in range(self.topLevelItemCount())]
-        )
+        result: List[TreeItemData] = []
+        # Walk with an explicit stack rather than recursing, reversed so the
+        # items are visited in the same (pre)order as they appear in the tree
+        stack: List[QTreeWidgetItem] = [
+            top
+            for i in reversed(range(self.topLevelItemCount()))
+            if (top := self.topLevelItem(i)) is not None
+        ]
+        while stack:
+            item = stack.pop()
+            if item.isExpanded():
+                result.append(cast(TreeWidgetItem, item).item_data)
+            stack.extend(
+                child
+                for i in reversed(range(item.childCount()))
+                if (child := item.child(i)) is not None
+            )
+        return result
 
     def export_state(self) -> TreeState:
         """Export the current state of the tree"""
@@ -250,13 +255,21 @@ class StatefulTree(QTreeWidget):
 
     def restore_state(self, state: TreeState) -> None:
         """Restore a previously exported tree state"""
-        self.collapseAll()
-        self.clearSelection()
-
-        # Restore expanded state first
-        for item_data in state["expanded_items"]:
-            if item := self.tree_items.get_item(item_data):
-                item.setExpanded(True)
+        # Avoid a repaint and an itemExpanded signal for every restored item
+        updates_enabled = self.updatesEnabled()
+        self.setUpdatesEnabled(False)
+        signals_blocked = self.blockSignals(True)
+        try:
+            self.collapseAll()
+            self.clearSelection()
+
+            # Restore expanded state first
+            for item_data in state["expanded_items"]:
+                if item := self.tree_items.get_item(item_data):
+                    item.setExpanded(True)
+        finally:
+            _ = self.blockSignals(signals_blocked)
+            self.setUpdatesEnabled(updates_enabled)
 
         # Create and post custom event for deferred selection
         # This is required for drag and drop to work correctly